@@ -2,13 +2,24 @@ import requests
 import json
 from typing import Dict, List, Optional, Any
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 class DatabaseManager:
     def __init__(self, base_url: str):
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
+        # requests.Session no es seguro entre hilos: una sesión por hilo
+        self._local = threading.local()
         self.logger = logging.getLogger(__name__)
         
+    @property
+    def session(self) -> requests.Session:
+        """Sesión HTTP del hilo actual (se crea en el primer uso)"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+        
     def _make_request(self, endpoint: str, method: str = 'GET', data: Dict = None) -> Dict:
         """Realizar petición a la API"""
         url = f"{self.base_url}/{endpoint}"
@@ -55,6 +66,39 @@ class DatabaseManager:
         endpoint = "canciones.php"
         return self._make_request(endpoint, 'POST', cancion_data)
 
+    def _create_cancion_safe(self, cancion_data: Dict) -> Dict:
+        """Crear canción sin propagar excepciones: un fallo solo afecta a su fila"""
+        try:
+            return self.create_cancion(cancion_data)
+        except Exception as e:
+            self.logger.error(f"Error creando canción: {e}")
+            return {'success': False, 'error': str(e)}
+
+    def create_canciones_bulk(self, canciones: List[Dict], max_workers: int = 4,
+                              progress_callback=None) -> List[Dict]:
+        """
+        Crear varias canciones en lote (peticiones solapadas, resultados en orden).
+        progress_callback(hechas, total) se llama al terminar cada canción.
+        """
+        total = len(canciones)
+        results = [None] * total
+        if total <= 1:
+            for i, cancion in enumerate(canciones):
+                results[i] = self._create_cancion_safe(cancion)
+                if progress_callback:
+                    progress_callback(i + 1, total)
+            return results
+        with ThreadPoolExecutor(max_workers=min(max_workers, total)) as executor:
+            futures = {
+                executor.submit(self._create_cancion_safe, cancion): i
+                for i, cancion in enumerate(canciones)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if progress_callback:
+                    progress_callback(done, total)
+        return results
+
     def update_cancion(self, cancion_id: int, cancion_data: Dict) -> Dict:
         """Actualizar canción existente"""
         endpoint = f"canciones.php?id={cancion_id}"
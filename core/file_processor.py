@@ -3,13 +3,22 @@
 # ==============================================================================
 
 import os
-import tempfile
+import io
 import logging
 from typing import Dict, List, Optional, Tuple
 import threading
+import time
 from datetime import datetime
 import re
 import json
+import functools
+import hashlib
+import importlib.util
+import copy
+from collections import Counter, OrderedDict
+from itertools import groupby
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # ==============================================================================
 # CONSTANTES GLOBALES - DEFINICIÓN ÚNICA Y CONSOLIDADA
@@ -50,43 +59,312 @@ TRAD_TO_AMERICAN = {
 
 TRAD_ROOTS = ["SOL", "DO", "RE", "MI", "FA", "LA", "SI"]
 
+# Raíz tradicional -> americana con las variantes de mayúsculas habituales ya
+# resueltas (DO, do, Do), para _map_traditional_root sin pasar por upper()
+_ROOT_LOOKUP = {
+    variant: TRAD_TO_AMERICAN[trad]
+    for trad in TRAD_ROOTS
+    for variant in (trad, trad.lower(), trad.title())
+}
+
+# Raíz tradicional al inicio del token (una sola alternativa anclada, SOL primero)
+_TRAD_ROOT_RE = re.compile('(?:' + '|'.join(TRAD_ROOTS) + ')')
+
 # Regex de validación
 ANGLO_CHORD_RE = re.compile(
     r'^[A-G](?:[#♯b♭]?)(?:m|M|maj|min|sus|dim|aug|add|\d+)?(?:.*)?$',
     re.IGNORECASE
 )
 
+# Acorde tradicional separado en raíz, alteración y resto (_convert_single_chord)
+_TRAD_CHORD_SPLIT_RE = re.compile(r'^(DO|RE|MI|FA|SOL|LA|SI)([#B]?)(.*)$', re.IGNORECASE)
 
-# Try to import PDF processing libraries
-try:
-    import PyPDF2
-    PDF_SUPPORT = True
-except ImportError:
-    PDF_SUPPORT = False
-    print("⚠️  PyPDF2 no instalado. Instala con: pip install PyPDF2")
+# Acorde válido en una sola pasada (_is_valid_chord_token): americano (A-G +
+# cualquier sufijo, como ANGLO_CHORD_RE) o raíz tradicional + alteración,
+# menor y números. El sufijo tradicional se evaluaba sobre el token en
+# mayúsculas, por eso 'b' y 'aj/in/im' no entran.
+# Primeras letras posibles de un acorde válido: raíces americanas y
+# tradicionales en ambos casos ('ſ', s larga, coincide con S en IGNORECASE)
+_CHORD_FIRST_CHARS = frozenset('ABCDEFGabcdefg' 'DRMFSLdrmfsl' 'ſ')
+_VALID_CHORD_RE = re.compile(
+    r'[A-Ga-g].*'
+    r'|(?i:' + '|'.join(TRAD_ROOTS) + r')[#♯♭]?[mM]?\d*'
+)
+
+# Páginas mínimas para repartir la extracción de un PDF entre procesos
+_PARALLEL_PAGES_MIN = 8
+
+# Segmentos entre saltos de línea (las líneas vacías no interesan)
+_TEXT_LINE_RE = re.compile(r'[^\n]+')
+
+# Caché en disco de resultados de process_pdf_file (sobrevive entre sesiones).
+# Va en el directorio de caché del usuario, no en el temporal compartido:
+# guarda el texto completo de las canciones
+_DISK_CACHE_DIR = os.path.join(
+    os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+    or os.path.join(os.path.expanduser('~'), '.cache'),
+    'cancionero_desk', 'pdf_cache'
+)
+# Versión del formato/extracción: subirla cuando cambie la extracción de
+# texto o la alineación de acordes, así no se sirven resultados viejos
+_CACHE_VERSION = 2
+# Límites de la caché en disco: entradas y antigüedad (segundos)
+_DISK_CACHE_MAX_ENTRIES = 200
+_DISK_CACHE_MAX_AGE = 30 * 24 * 3600
+# Resultados que FileProcessor conserva en memoria (los más recientes)
+_FILE_CACHE_MAX_ENTRIES = 32
+
+# Intervalo mínimo entre avisos de progreso a la UI (~30 por segundo)
+_PROGRESS_MIN_INTERVAL = 1 / 30
+
+# Acordes entre corchetes ([C], [Am7]) y sueltos, para _extract_chords
+_BRACKET_CHORD_RE = re.compile(r'\[([A-G][#b]?[0-9]*(?:m|maj|min|dim|aug)?[0-9]*)\]', re.IGNORECASE)
+_LOOSE_CHORD_RE = re.compile(r'\b([A-G][#b]?(?:m|maj|min|dim|aug)?[0-9]*)\b', re.IGNORECASE)
+
+# Indicadores de sección (estrofa, coro...) buscados como subcadenas
+_SECTION_INDICATORS = (
+    'VERSO', 'CORO', 'ESTRIBILLO', 'INTRO', 'OUTRO', 'PUENTE',
+    'ESTROFA', 'CODA', 'FINAL'
+)
+# Las mismas marcas en una sola alternativa: una búsqueda en C por línea
+_SECTION_INDICATORS_RE = re.compile('|'.join(_SECTION_INDICATORS))
+
+# Palabras y secciones que delatan un título o una sección (_is_song_title,
+# _is_song_section); definidas una vez en lugar de en cada llamada
+_TITLE_KEYWORDS = (
+    'canción', 'cancion', 'himno', 'salmo', 'coro', 'aleluya',
+    'santo', 'gloria', 'padre', 'jesús', 'jesus', 'maría', 'maria'
+)
+_SECTION_NAMES = frozenset({'INTRO', 'VERSO', 'CORO', 'ESTRIBILLO', 'PUENTE', 'FINAL', 'CODA'})
+_SECTION_KEYWORDS = ('VERSO', 'CORO', 'ESTROFA', 'PUENTE', 'INTRODUCCIÓN')
+
+# Nombre de nota (tradicional o americana) -> tonalidad americana, para
+# _detect_tonality_from_text. El token debe parecer un acorde completo
+# (raíz + alteración/calidad/números), no una letra dentro de una palabra.
+_KEY_ALIAS = {
+    'DO': 'C', 'RE': 'D', 'MI': 'E', 'FA': 'F', 'SOL': 'G', 'LA': 'A', 'SI': 'B',
+    'C': 'C', 'D': 'D', 'E': 'E', 'F': 'F', 'G': 'G', 'A': 'A', 'B': 'B',
+}
+_KEY_TOKEN_RE = re.compile(
+    r'\b(' + '|'.join(sorted(_KEY_ALIAS, key=len, reverse=True)) + r')'
+    r'(?:[#B♯♭]|MAJ|MIN|SUS|DIM|AUG|ADD|M|\d)*(?!\w)'
+)
+_COMMON_KEYS = frozenset({'C', 'G', 'D', 'A', 'E', 'F'})
+
+# Primer byte distinto de espacio (búsqueda de destino en la letra codificada)
+_NON_SPACE_RE = re.compile(rb'[^ ]')
+
+# Alteraciones Unicode a su forma ASCII (acordes normalizados; los alineados se escriben en bytes)
+_ASCII_ACCIDENTALS = str.maketrans({'♯': '#', '♭': 'b'})
+
+# Marcas típicas de líneas de acordes (#, b, ♯, ♭, /): se eliminan con
+# str.translate y se compara la longitud, en una sola pasada en C
+_CHORD_MARK_TABLE = str.maketrans('', '', '#b♯♭/')
 
-try:
-    import pdfplumber
-    PDFPLUMBER_SUPPORT = True
-except ImportError:
-    PDFPLUMBER_SUPPORT = False
-    print("⚠️  pdfplumber no instalado. Instala con: pip install pdfplumber")
-
-try:
-    import pytesseract
-    from PIL import Image
-    OCR_SUPPORT = True
-except ImportError:
-    OCR_SUPPORT = False
-    print("⚠️  pytesseract/PIL no instalados. Instala con: pip install pytesseract pillow")
+
+# ==============================================================================
+# FUNCIONES PURAS MEMOIZADAS (solo dependen del texto recibido)
+# ==============================================================================
+# La caché vive a nivel de módulo: con lru_cache sobre los métodos la clave
+# incluiría self y cada FileProcessor (db_manager, callback de la UI...)
+# quedaría retenido por la caché. Los métodos de la clase delegan aquí.
+
+@functools.lru_cache(maxsize=4096)
+def _norm_trad_to_ang(chord: str) -> str:
+    """
+    Normalizar acordes tradicionales (DO, RE, MI...) a americana (C, D, E...)
+    Preserva sufijos completos y capitalización correcta (Cm, C7, Cmaj7)
+    """
+    if not chord:
+        return chord
+    
+    # NO convertir todo a mayúsculas aún, preservar case original.
+    # Alteraciones Unicode (♯/♭) a ASCII en una sola pasada
+    chord = chord.strip().translate(_ASCII_ACCIDENTALS)
+    
+    # Acorde con bajo (DO/SOL, Bb/F): raíz y bajo se normalizan por separado
+    if '/' in chord:
+        root_part, bass = chord.split('/', 1)
+        if root_part and bass:
+            return (_norm_trad_to_ang(root_part) + '/' +
+                    _norm_trad_to_ang(bass))
+    
+    chord_upper = chord.upper()
+    
+    # 1. Intentar coincidencia exacta en el diccionario
+    if chord_upper in TRAD_TO_AMERICAN:
+        return TRAD_TO_AMERICAN[chord_upper]
+    
+    # 2. Buscar prefijo tradicional (SOL antes que SI)
+    root_match = _TRAD_ROOT_RE.match(chord_upper)
+    if root_match:
+        # Extraer sufijo completo (todo después de la raíz)
+        suffix_upper = chord_upper[root_match.end():]
+        american_root = TRAD_TO_AMERICAN[root_match.group()]
+        
+        # Normalizar sufijo preservando case correcto
+        if suffix_upper:
+            # 'm' o 'M' al inicio -> acorde menor (usar 'm' minúscula)
+            if suffix_upper[0] == 'M' and not suffix_upper.startswith('MAJ'):
+                suffix = 'm' + suffix_upper[1:].lower()
+            # 'maj' o 'MAJ' -> usar 'maj' minúscula
+            elif suffix_upper.startswith('MAJ'):
+                suffix = 'maj' + suffix_upper[3:].lower()
+            # 'min' o 'MIN' -> usar 'min' minúscula
+            elif suffix_upper.startswith('MIN'):
+                suffix = 'min' + suffix_upper[3:].lower()
+            # Otros sufijos (números, #, b) -> lowercase
+            else:
+                suffix = suffix_upper.lower()
+        else:
+            suffix = ''
+        
+        return american_root + suffix
+    
+    # 3. Si no es tradicional, devolver con capitalización estándar
+    # Primera letra mayúscula, resto minúscula (C, Dm, F#)
+    if len(chord_upper) > 0 and chord_upper[0] in 'ABCDEFG':
+        return chord_upper[0] + chord_upper[1:].lower()
+    
+    return chord_upper
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_valid_chord_token_impl(token: str) -> bool:
+    """
+    Determinar si un token es un acorde válido.
+    Un único patrón compilado cubre notación americana y tradicional.
+    """
+    token = token.strip()
+    if not token or len(token) > 10:
+        return False
+    
+    # Descarte rápido de palabras que no pueden empezar un acorde
+    if token[0] not in _CHORD_FIRST_CHARS:
+        return False
+    
+    # Acorde americano (A-G) o tradicional (DO, RE, MI, FA, SOL, LA, SI)
+    return _VALID_CHORD_RE.fullmatch(token) is not None
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_chord_line_impl(line: str) -> bool:
+    """
+    Determinar si una línea contiene SOLO acordes (sin texto)
+    Lógica estricta: acordes y texto son mutuamente excluyentes
+    """
+    line = line.strip()
+    if not line or len(line) < 2:
+        return False
+    
+    # Líneas muy largas son letra
+    if len(line) > 80:
+        return False
+    
+    # Dividir en tokens
+    tokens = [t for t in line.split() if t.strip()]
+    if not tokens:
+        return False
+    
+    # CRÍTICO: Verificar CADA token; la primera palabra de texto decide
+    is_valid = _is_valid_chord_token_impl
+    found_chord = False
+    
+    for token in tokens:
+        # Limpiar puntuación
+        clean_token = token.strip(",.;:!?()[]{}\"'")
+        
+        if is_valid(clean_token):
+            found_chord = True
+        elif len(clean_token) >= 3:
+            # Palabras de 3+ letras que no son acordes = TEXTO.
+            # REGLA ESTRICTA: con una sola palabra de texto NO es línea de acordes
+            return False
+    
+    # Debe tener al menos 1 acorde válido
+    return found_chord
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_chord_line_fallback_impl(line: str) -> bool:
+    """Heurística de respaldo: muchas tokens cortas o presencia de #/b/♯/♭//"""
+    tokens = line.split()  # mismos separadores que \s+, sin tokens vacíos
+    short_tokens = sum(1 for tok in tokens if len(tok) <= 5)
+    return (short_tokens >= max(1, len(tokens)//2) or
+            len(line) != len(line.translate(_CHORD_MARK_TABLE)))
+
+
+@functools.lru_cache(maxsize=4096)
+def _looks_like_chord_impl(token: str) -> bool:
+    """
+    Determinar si un token parece ser un acorde musical
+    (Usa _is_valid_chord_token_impl internamente para consistencia)
+    """
+    if not token:
+        return False
+        
+    token = token.strip().strip("(),.;:")
+    
+    # Si tiene barra, verificar solo la parte izquierda (acorde/bajo)
+    if "/" in token:
+        token = token.split("/", 1)[0].strip().strip("(),.;:")
+    
+    # Usar la validación consolidada
+    return _is_valid_chord_token_impl(token)
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_section_line_impl(line: str) -> bool:
+    """Determinar si una línea es una sección (como estrofa, coro)"""
+    # La coincidencia exacta queda cubierta por la búsqueda de subcadenas
+    return _SECTION_INDICATORS_RE.search(line.upper()) is not None
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_chord_impl(token: str) -> Optional[str]:
+    """
+    Validar y normalizar un token de acorde en una sola consulta:
+    devuelve el acorde en notación americana o None si no es acorde
+    """
+    if not _is_valid_chord_token_impl(token):
+        return None
+    return _norm_trad_to_ang(token)
+
+
+# Librerías opcionales: al cargar el módulo solo se comprueba que estén
+# instaladas (find_spec no ejecuta su código); cada una se importa en el
+# método que la usa, así importar file_processor no arrastra pdfminer, etc.
+# Las que faltan solo se registran en debug; el aviso con la instalación se
+# muestra al necesitarlas (process_pdf_file, archivos DOCX)
+_module_logger = logging.getLogger(__name__)
+
+def _has_module(name: str) -> bool:
+    """Indicar si un módulo está instalado sin importarlo"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+PDF_SUPPORT = _has_module('PyPDF2')
+if not PDF_SUPPORT:
+    _module_logger.debug("PyPDF2 no instalado. Instala con: pip install PyPDF2")
+
+PYMUPDF_SUPPORT = _has_module('fitz')  # PyMuPDF
+if not PYMUPDF_SUPPORT:
+    _module_logger.debug("PyMuPDF no instalado (opcional, extracción PDF más rápida). Instala con: pip install pymupdf")
+
+PDFPLUMBER_SUPPORT = _has_module('pdfplumber')
+if not PDFPLUMBER_SUPPORT:
+    _module_logger.debug("pdfplumber no instalado. Instala con: pip install pdfplumber")
+
+OCR_SUPPORT = _has_module('pytesseract') and _has_module('PIL')
+if not OCR_SUPPORT:
+    _module_logger.debug("pytesseract/PIL no instalados. Instala con: pip install pytesseract pillow")
 
 # Try to import python-docx for Word support
-try:
-    from docx import Document as DocxDocument
-    DOCX_SUPPORT = True
-except ImportError:
-    DOCX_SUPPORT = False
-    print("⚠️  python-docx no instalado. Instala con: pip install python-docx")
+DOCX_SUPPORT = _has_module('docx')
+if not DOCX_SUPPORT:
+    _module_logger.debug("python-docx no instalado. Instala con: pip install python-docx")
 
 class FileProcessor:
     def __init__(self, db_manager=None, *args, **kwargs):        
@@ -97,14 +375,35 @@ class FileProcessor:
         self.logger = kwargs.get('logger') if 'logger' in kwargs else None
         #self.logger = logging.getLogger(__name__)
         self.progress_callback = None        
+        self._last_progress_ts = 0.0
+        self._last_progress_percent = None
+        # Últimos resultados procesados (LRU acotada), por archivo + opciones
+        self._file_cache = OrderedDict()
         
     def set_progress_callback(self, callback):
         """Set callback for progress updates"""
         self.progress_callback = callback
         
+    def _progress_due(self, percent=None) -> bool:
+        """
+        Indicar si un aviso de progreso se reenviaría ahora; permite saltarse
+        el formateo del mensaje en bucles por página
+        """
+        if not self.progress_callback:
+            return False
+        
+        # Reenviar solo si pasó el intervalo mínimo, el porcentaje avanzó al menos 1
+        # punto o es el aviso final: cada llamada puede forzar un repintado de la UI
+        last_percent = self._last_progress_percent
+        return (time.monotonic() - self._last_progress_ts >= _PROGRESS_MIN_INTERVAL or
+                (percent is not None and percent >= 100) or
+                (percent is not None and last_percent is not None and abs(percent - last_percent) >= 1))
+        
     def _update_progress(self, message, percent=None):
-        """Update progress through callback"""
-        if self.progress_callback:
+        """Update progress through callback (throttled to ~30 updates/s)"""
+        if self._progress_due(percent):
+            self._last_progress_ts = time.monotonic()
+            self._last_progress_percent = percent
             self.progress_callback(message, percent)
             
     def process_pdf_file(self, file_path: str, options: Dict = None) -> Dict:
@@ -118,31 +417,53 @@ class FileProcessor:
         Returns:
             Dict con resultados del procesamiento
         """
-        if not PDF_SUPPORT and not PDFPLUMBER_SUPPORT:
+        if not PDF_SUPPORT and not PDFPLUMBER_SUPPORT and not PYMUPDF_SUPPORT:
+            print("⚠️  No hay librerías PDF instaladas. Instala con: pip install pymupdf pdfplumber PyPDF2")
             return {
                 'success': False,
-                'error': 'Librerías PDF no disponibles. Instala PyPDF2 o pdfplumber'
+                'error': 'Librerías PDF no disponibles. Instala PyMuPDF, pdfplumber o PyPDF2'
             }
             
         options = options or {}
         self._update_progress(f"Procesando PDF: {os.path.basename(file_path)}", 10)
         
+        # Caché en disco: mismo archivo (ruta, fecha, tamaño) y mismas opciones
+        cache_path = None if options.get('no_cache') else self._disk_cache_path(file_path, options)
+        if cache_path:
+            cached = self._load_disk_cache(cache_path)
+            if cached is not None:
+                print(f"♻️  PDF sin cambios, usando caché en disco: {file_path}")
+                return cached
+        
         try:
-            # Determinar método de procesamiento
-            use_pdfplumber = PDFPLUMBER_SUPPORT and options.get('use_pdfplumber', True)
-            
-            if use_pdfplumber and PDFPLUMBER_SUPPORT:
-                return self._process_with_pdfplumber(file_path, options)
-            elif PDF_SUPPORT:
-                return self._process_with_pypdf2(file_path, options)
-            else:
+            # Métodos de procesamiento en orden de preferencia (PyMuPDF primero,
+            # por velocidad); si uno falla se prueba el siguiente disponible
+            backends = []
+            if PYMUPDF_SUPPORT and options.get('use_pymupdf', True):
+                backends.append(self._process_with_pymupdf)
+            if PDFPLUMBER_SUPPORT and options.get('use_pdfplumber', True):
+                backends.append(self._process_with_pdfplumber)
+            if PDF_SUPPORT:
+                backends.append(self._process_with_pypdf2)
+            if not backends:
                 return {
                     'success': False,
                     'error': 'No hay librerías PDF disponibles'
                 }
+            
+            for backend in backends:
+                result = backend(file_path, options)
+                if result.get('success'):
+                    break
+                print(f"⚠️ {result.get('error')}; probando el siguiente método")
+            
+            if cache_path and result.get('success'):
+                self._store_disk_cache(cache_path, result)
+            return result
                 
         except Exception as e:
-            self.logger.error(f"Error procesando PDF {file_path}: {e}")
+            if self.logger:
+                self.logger.error(f"Error procesando PDF {file_path}: {e}")
             return {
                 'success': False,
                 'error': f'Error procesando PDF: {str(e)}'
@@ -157,159 +478,147 @@ class FileProcessor:
         Normalizar acordes tradicionales (DO, RE, MI...) a americana (C, D, E...)
         Preserva sufijos completos y capitalización correcta (Cm, C7, Cmaj7)
         """
-        if not chord:
-            return chord
-        
-        # NO convertir todo a mayúsculas aún, preservar case original
-        chord = chord.strip()
-        chord_upper = chord.upper()
-        
-        # 1. Intentar coincidencia exacta en el diccionario
-        if chord_upper in TRAD_TO_AMERICAN:
-            return TRAD_TO_AMERICAN[chord_upper]
-        
-        # 2. Buscar prefijos tradicionales (más largos primero: SOL antes que SI)
-        for trad_root in TRAD_ROOTS:
-            if chord_upper.startswith(trad_root):
-                # Extraer sufijo completo (todo después de la raíz)
-                suffix_upper = chord_upper[len(trad_root):]
-                american_root = TRAD_TO_AMERICAN[trad_root]
-                
-                # Normalizar sufijo preservando case correcto
-                if suffix_upper:
-                    # 'm' o 'M' al inicio -> acorde menor (usar 'm' minúscula)
-                    if suffix_upper[0] == 'M' and not suffix_upper.startswith('MAJ'):
-                        suffix = 'm' + suffix_upper[1:].lower()
-                    # 'maj' o 'MAJ' -> usar 'maj' minúscula
-                    elif suffix_upper.startswith('MAJ'):
-                        suffix = 'maj' + suffix_upper[3:].lower()
-                    # 'min' o 'MIN' -> usar 'min' minúscula
-                    elif suffix_upper.startswith('MIN'):
-                        suffix = 'min' + suffix_upper[3:].lower()
-                    # Otros sufijos (números, #, b) -> lowercase
-                    else:
-                        suffix = suffix_upper.lower()
-                else:
-                    suffix = ''
-                
-                return american_root + suffix
-        
-        # 3. Si no es tradicional, devolver con capitalización estándar
-        # Primera letra mayúscula, resto minúscula (C, Dm, F#)
-        if len(chord_upper) > 0 and chord_upper[0] in 'ABCDEFG':
-            return chord_upper[0] + chord_upper[1:].lower()
-        
-        return chord_upper
+        return _norm_trad_to_ang(chord)
     
     def _looks_like_chord(self, token: str) -> bool:
         """
         Determinar si un token parece ser un acorde musical
         (Usa _is_valid_chord_token internamente para consistencia)
         """
-        if not token or not token.strip():
-            return False
-            
-        token = token.strip().strip("(),.;:")
-        
-        # Si tiene barra, verificar solo la parte izquierda (acorde/bajo)
-        if "/" in token:
-            left_part = token.split("/", 1)[0]
-            return self._looks_like_chord(left_part)
-        
-        # Usar la validación consolidada
-        return self._is_valid_chord_token(token)
+        return _looks_like_chord_impl(token)
+    
+    def _parse_chord(self, token: str) -> Optional[str]:
+        """
+        Validar y normalizar un token de acorde en una sola consulta:
+        devuelve el acorde en notación americana o None si no es acorde
+        """
+        return _parse_chord_impl(token)
     
     def _normalize_traditional_chord(self, token: str) -> str:
         """
         Alias de _normalize_traditional_to_american para compatibilidad
         """
-        return self._normalize_traditional_to_american(token)
+        return _norm_trad_to_ang(token)
     
     def _is_chord_line(self, line: str) -> bool:
         """
         Determinar si una línea contiene SOLO acordes (sin texto)
         Lógica estricta: acordes y texto son mutuamente excluyentes
         """
-        line = line.strip()
-        if not line or len(line) < 2:
-            return False
-        
-        # Líneas muy largas son letra
-        if len(line) > 80:
-            return False
-        
-        # Dividir en tokens
-        tokens = [t for t in line.split() if t.strip()]
-        if not tokens:
-            return False
-        
-        # CRÍTICO: Verificar CADA token
-        chord_count = 0
-        text_count = 0
-        
-        for token in tokens:
-            # Limpiar puntuación
-            clean_token = token.strip(",.;:!?()[]{}\"'")
-            
-            if self._is_valid_chord_token(clean_token):
-                chord_count += 1
-            else:
-                # Si NO es acorde, verificar si es texto real
-                # Palabras de 3+ letras que no son acordes = TEXTO
-                if len(clean_token) >= 3:
-                    text_count += 1
-        
-        # REGLA ESTRICTA: Si hay aunque sea 1 palabra de texto, NO es línea de acordes
-        if text_count > 0:
-            return False
-        
-        # Debe tener al menos 1 acorde válido
-        return chord_count > 0
+        return _is_chord_line_impl(line)
 
     def _is_valid_chord_token(self, token: str) -> bool:
         """
         Determinar si un token es un acorde válido.
-        Aplica primero patrones positivos, luego heurísticas de rechazo.
+        Un único patrón compilado cubre notación americana y tradicional.
         """
-        token = token.strip()
-        if not token or len(token) > 10:
-            return False
-        
-        token_upper = token.upper()
-        
-        # 1. Validar acordes americanos (A-G)
-        if ANGLO_CHORD_RE.match(token):
-            return True
-        
-        # 2. Validar acordes tradicionales (DO, RE, MI, FA, SOL, LA, SI)
-        for trad_root in TRAD_ROOTS:
-            if token_upper.startswith(trad_root):
-                suffix = token_upper[len(trad_root):]
-                if not suffix or re.match(r'^[#b♯♭]?[mM]?(aj|in|im)?\d*$', suffix):
-                    return True
-        
-        # 3. HEURÍSTICA: Palabras >6 letras raramente son acordes
-        #    (excepto casos como "Cmaj7" que ya pasaron el filtro 1)
-        if len(token) > 6:
-            return False
-        
-        # 4. Rechazar palabras comunes conocidas (reducida, solo ambiguas)
-        non_chords = {
-            'ESTA', 'ES', 'PARA', 'QUE', 'CON', 'POR', 'SEÑOR', 'DIOS',
-            'JESUS', 'CRISTO', 'MARIA', 'SANTO', 'LUZ', 'AMOR', 'VIDA'
-        }
-        
-        if token_upper in non_chords:
-            return False
-        
-        return False
+        return _is_valid_chord_token_impl(token)
     
 
 # ==============================================================================
 # PARTE 3: FUNCIONES DE PROCESAMIENTO DE ARCHIVOS ACTUALIZADAS
 # ==============================================================================
 
+    def _stat_cache_key(self, file_path: str, options: Dict) -> Optional[str]:
+        """Clave de caché según versión, ruta, fecha, tamaño y opciones (sin leer el archivo)"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        options_json = json.dumps(options or {}, sort_keys=True, default=str)
+        key_source = (f"{_CACHE_VERSION}|{os.path.abspath(file_path)}|"
+                      f"{st.st_mtime_ns}|{st.st_size}|{options_json}")
+        return hashlib.blake2b(key_source.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _file_cache_key(self, file_path: str, options: Dict) -> Optional[str]:
+        """Clave de la caché en memoria; None para los PDF, que ya usan la caché en disco"""
+        if os.path.splitext(file_path)[1].lower() == '.pdf':
+            return None
+        return self._stat_cache_key(file_path, options)
+
+    def _cached_file_result(self, cache_key: Optional[str]) -> Optional[Dict]:
+        """Copia del resultado guardado en memoria para cache_key, o None"""
+        if cache_key is None or cache_key not in self._file_cache:
+            return None
+        self._file_cache.move_to_end(cache_key)
+        # Copia propia: quien llama suele modificar las canciones devueltas
+        return copy.deepcopy(self._file_cache[cache_key])
+
+    def _remember_file_result(self, cache_key: Optional[str], result: Dict):
+        """Guardar un resultado correcto en la caché en memoria, descartando los más viejos"""
+        if not cache_key or not result.get('success'):
+            return
+        self._file_cache[cache_key] = copy.deepcopy(result)
+        self._file_cache.move_to_end(cache_key)
+        while len(self._file_cache) > _FILE_CACHE_MAX_ENTRIES:
+            self._file_cache.popitem(last=False)
+
+    def _disk_cache_path(self, file_path: str, options: Dict) -> Optional[str]:
+        """Ruta del resultado en la caché de disco, según ruta, fecha, tamaño y opciones"""
+        key = self._stat_cache_key(file_path, options)
+        if key is None:
+            return None
+        return os.path.join(_DISK_CACHE_DIR, key + '.json')
+
+    def _load_disk_cache(self, cache_path: str) -> Optional[Dict]:
+        """Leer un resultado de la caché de disco (None si no existe o está dañado)"""
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Marcar como usado: la poda descarta primero lo que hace más que no se lee
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return result
+
+    def _store_disk_cache(self, cache_path: str, result: Dict):
+        """Guardar un resultado en la caché de disco; los errores solo se informan"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            # Escribir a un temporal y renombrar: nunca queda un JSON a medias
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ No se pudo guardar la caché de {cache_path}: {e}")
+        self._prune_disk_cache(os.path.dirname(cache_path))
+
+    def _prune_disk_cache(self, cache_dir: str):
+        """Borrar entradas vencidas y, sobre el máximo, las usadas hace más tiempo"""
+        try:
+            entries = []
+            for entry in os.scandir(cache_dir):
+                if entry.name.endswith('.json'):
+                    entries.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            return
+        
+        entries.sort(reverse=True)  # más recientes primero
+        cutoff = time.time() - _DISK_CACHE_MAX_AGE
+        for index, (mtime, path) in enumerate(entries):
+            if index >= _DISK_CACHE_MAX_ENTRIES or mtime < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
     def _process_single_file(self, file_path: str, options: Dict) -> Dict:
+        """Procesar un solo archivo, reutilizando el resultado si su contenido no cambió"""
+        cache_key = self._file_cache_key(file_path, options)
+        cached = self._cached_file_result(cache_key)
+        if cached is not None:
+            print(f"♻️  Archivo sin cambios, usando resultado previo: {file_path}")
+            return cached
+        
+        file_result = self._process_file_by_type(file_path, options)
+        self._remember_file_result(cache_key, file_result)
+        return file_result
+
+    def _process_file_by_type(self, file_path: str, options: Dict) -> Dict:
         """Procesar un solo archivo según su tipo"""
         print("")
         print("*************************************************")
@@ -323,7 +632,13 @@ class FileProcessor:
             print("Procesando archivo PDF...")
             return self.process_pdf_file(file_path, options)
         
-        elif file_ext in ('.docx', '.doc') and DOCX_SUPPORT:
+        elif file_ext in ('.docx', '.doc'):
+            if not DOCX_SUPPORT:
+                print("⚠️  python-docx no instalado. Instala con: pip install python-docx")
+                return {
+                    'success': False,
+                    'error': 'python-docx no instalado. Instala con: pip install python-docx'
+                }
             print("📌 Procesando archivo DOCX...")
             return self._process_docx_file(file_path, options)
         
@@ -356,9 +671,15 @@ class FileProcessor:
         try:
             self._update_progress("Extrayendo texto desde Word...", 10)
             print("Extrayendo texto desde Word...(_process_docx_file)")
+            from docx import Document as DocxDocument
             doc = DocxDocument(file_path)
-            paragraphs = [p.text for p in doc.paragraphs if p.text is not None]
-            full_text = "\n".join(paragraphs)
+            # Volcar los párrafos directamente a un buffer (sin lista intermedia de textos)
+            buffer = io.StringIO()
+            for i, paragraph in enumerate(doc.paragraphs):
+                if i:
+                    buffer.write("\n")
+                buffer.write(paragraph.text or "")
+            full_text = buffer.getvalue()
             # Crear una "canción" única con el contenido
             song = self._create_single_song_from_text(full_text, file_path)
             return {
@@ -376,7 +697,8 @@ class FileProcessor:
     def _create_single_song_from_text(self, text: str, file_path: str) -> Dict:
         """Crear una sola canción desde el texto completo, formateada para tipografía monoespaciada."""
         print("✅  Creando canción desde texto completo...(_create_single_song_from_text)")
-        lines = text.split('\n')
+        # Dividir en líneas una sola vez y reutilizarlas en cada paso
+        lines = text.splitlines()
         file_name = os.path.splitext(os.path.basename(file_path))[0]
 
         # Título según tu lógica actual
@@ -384,12 +706,13 @@ class FileProcessor:
         print(f"📄 Título extraído: {title}")
 
         # Reconstruir el texto con acordes alineados
-        formatted_song = self._reconstruct_fixedwidth_song(text)
+        formatted_lines = self._reconstruct_fixedwidth_lines(lines)
+        formatted_song = "\n".join(formatted_lines)
         print("📄 Letra formateada creada. con (_reconstruct_fixedwidth_song)")
         print(formatted_song)
 
-        # Detectar tonalidad
-        probable_key = self._detect_tonality_from_text(formatted_song)
+        # Detectar tonalidad (solo se examinan las primeras líneas)
+        probable_key = self._detect_tonality_from_text(formatted_lines[:10])
         print(f"📄 Tonalidad probable detectada: {probable_key}")
 
         return {
@@ -408,12 +731,26 @@ class FileProcessor:
         Reconstruye texto de canción con acordes alineados en fuente monoespaciada.
         Detecta pares (línea de acordes, línea de letra) y los reensambla.
         """
+        # Unir líneas resultantes con salto de línea
+        formatted = "\n".join(self._reconstruct_fixedwidth_lines(text.splitlines(), tabsize))
+        print("✅ ✅ Reconstrucción completada.")
+        print(formatted)
+        
+        return formatted
+
+    def _reconstruct_fixedwidth_lines(self, raw_lines: List[str], tabsize: int = 4) -> List[str]:
+        """
+        Igual que _reconstruct_fixedwidth_song pero sobre líneas ya divididas;
+        devuelve la lista de líneas reconstruidas.
+        """
         print("✅ ✅ Reconstruyendo canción en formato monoespaciado...(_reconstruct_fixedwidth_song)")
         def normalize_tabs(s: str) -> str:
-            return s.replace('\t', ' ' * tabsize)
+            return s.expandtabs(tabsize)
         
 
-        lines = [normalize_tabs(l.rstrip()) for l in text.splitlines()]
+        lines = [normalize_tabs(l.rstrip()) for l in raw_lines]
+        # Clasificar cada línea una sola vez (antes se evaluaba dos veces por iteración)
+        chord_flags = [self._is_chord_line(l) for l in lines]
         output_lines = []
         i = 0
         n = len(lines)
@@ -426,16 +763,15 @@ class FileProcessor:
                 continue
 
             # Si la línea es de acordes y hay una siguiente con letra
-            if self._is_chord_line(line) and i + 1 < n and not self._is_chord_line(lines[i + 1]):                
+            if chord_flags[i] and i + 1 < n and not chord_flags[i + 1]:
                 print("📌 Línea de acordes detectada:")
 
-                chord_line_raw = line
-                print(f"  Acordes: {chord_line_raw}")
-                lyric_line_raw = lines[i+1]
-                print(f"  Letra:   {lyric_line_raw}")
+                lyric_line = lines[i + 1]
+                print(f"  Acordes: {line}")
+                print(f"  Letra:   {lyric_line}")
 
-                # normaliza tabs si hiciste afuera
-                chord_aligned, lyric_padded = self.align_chord_over_lyric(chord_line_raw, lyric_line_raw)
+                # Las tabulaciones ya se expandieron arriba: se pasan las líneas tal cual
+                chord_aligned, lyric_padded = self.align_chord_over_lyric(line, lyric_line)
                 print(f"  Acordes alineados: {chord_aligned}")
                 print(f"  Letra ajustada:    {lyric_padded}")
 
@@ -450,11 +786,7 @@ class FileProcessor:
                 output_lines.append(line)
                 i += 1
 
-        # Unir líneas resultantes con salto de línea
-        print("✅ ✅ Reconstrucción completada.")
-        print("\n".join(output_lines))
-        
-        return "\n".join(output_lines)
+        return output_lines
 
     def align_chord_over_lyric(self, chord_line: str, lyric_line: str, tabsize: int = 4) -> (str, str):
         """
@@ -462,81 +794,88 @@ class FileProcessor:
         """
         print("✅ Alineando acordes sobre letra... (align_chord_over_lyric)")
         max_len = max(len(chord_line), len(lyric_line))
-        chord = chord_line.ljust(max_len)
-        lyric = lyric_line.ljust(max_len)
-        chord_out = list(" " * max_len)
+        # Trabajar por columnas sobre bytes (1 byte por carácter): la letra solo se usa
+        # para distinguir espacios, así que los caracteres fuera de latin-1 se reemplazan.
+        # Sin rellenar con ljust: las columnas más allá de la letra cuentan como espacios.
+        lyric = lyric_line.encode('latin-1', errors='replace')
+        chord_out = bytearray(b" " * max_len)
+        # Acordes con caracteres fuera de latin-1 (p. ej. dígitos '７' o '١', que
+        # \d acepta): se ubican con un marcador de un byte por carácter y al
+        # final se reponen los caracteres originales en las mismas columnas
+        wide_tokens = []
 
         for m in CHORD_TOKEN_RE.finditer(chord_line):
             token = m.group(0)
             
-            # ✅ NORMALIZAR ACORDE
+            # ✅ NORMALIZAR ACORDE (ya con ♯/♭ como #/b, caben en un byte)
             token_normalized = self._normalize_traditional_chord(token)
+            try:
+                token_bytes = token_normalized.encode('latin-1')
+                is_wide = False
+            except UnicodeEncodeError:
+                token_bytes = token_normalized.encode('latin-1', errors='replace')
+                is_wide = True
             
             start = m.start()
             end = m.end()
-            center = int(round((start + end - 1) / 2.0))
+            span = start + end - 1
+            center = (span + ((span >> 1) & 1)) >> 1  # round(span / 2), en enteros
 
             # Buscar target en lyric
             target = None
-            if center < len(lyric) and lyric[center] != " ":
+            if center < len(lyric) and lyric[center] != 0x20:
                 target = center
             else:
+                # Carácter visible más cercano a cada lado dentro de la ventana
+                # (a igual distancia gana la izquierda)
                 max_search = max(end - start, 6)
-                for d in range(1, max_search + 1):
-                    left = center - d
-                    right = center + d
-                    if left >= 0 and left < len(lyric) and lyric[left] != " ":
-                        target = left
-                        break
-                    if right >= 0 and right < len(lyric) and lyric[right] != " ":
-                        target = right
-                        break
-                if target is None:
-                    target = min(center, len(lyric)-1)
+                window_start = max(0, center - max_search)
+                left_part = lyric[window_start:center].rstrip(b" ")
+                left = window_start + len(left_part) - 1 if left_part else None
+                right_match = _NON_SPACE_RE.search(lyric, center + 1, center + max_search + 1)
+                right = right_match.start() if right_match else None
+                
+                if left is not None and (right is None or center - left <= right - center):
+                    target = left
+                elif right is not None:
+                    target = right
+                else:
+                    target = min(center, max_len - 1)
 
             # Calcular posición con token normalizado
-            left_pos = target - (len(token_normalized) // 2)
-            left_pos = max(0, min(left_pos, max_len - len(token_normalized)))
+            token_len = len(token_bytes)
+            left_pos = target - (token_len // 2)
+            left_pos = max(0, min(left_pos, max_len - token_len))
 
-            # Resolver conflictos
+            # Resolver conflictos: un hueco está libre si todas sus celdas son espacios
+            # (bytearray.count recorre el tramo en C, sin bucle carácter a carácter)
             conflict_shift = 0
-            while True:
-                conflict = False
-                for j in range(len(token_normalized)):
-                    if chord_out[left_pos + j + conflict_shift] != " ":
-                        conflict = True
-                        break
-                if not conflict:
-                    break
+            while chord_out[left_pos + conflict_shift:left_pos + conflict_shift + token_len].count(b" ") != token_len:
                 conflict_shift += 1
-                if left_pos + conflict_shift + len(token_normalized) > max_len:
-                    found_left = False
-                    for shift_left in range(1, len(token_normalized)+1):
-                        lp = left_pos - shift_left
-                        if lp < 0:
-                            break
-                        ok = True
-                        for j in range(len(token_normalized)):
-                            if chord_out[lp + j] != " ":
-                                ok = False
-                                break
-                        if ok:
+                if left_pos + conflict_shift + token_len > max_len:
+                    # Sin lugar a la derecha: probar corriendo el acorde a la izquierda
+                    for lp in range(left_pos - 1, max(left_pos - token_len, 0) - 1, -1):
+                        if chord_out[lp:lp + token_len].count(b" ") == token_len:
                             left_pos = lp
                             conflict_shift = 0
-                            found_left = True
                             break
-                    if not found_left:
-                        break
+                    break
             left_pos += conflict_shift
 
-            # ✅ ESCRIBIR TOKEN NORMALIZADO
-            for j, ch in enumerate(token_normalized):
-                pos = left_pos + j
-                if 0 <= pos < max_len:
-                    chord_out[pos] = ch
+            # ✅ ESCRIBIR TOKEN NORMALIZADO (recortado al ancho disponible)
+            visible = token_bytes[:max_len - left_pos]
+            chord_out[left_pos:left_pos + len(visible)] = visible
+            if is_wide:
+                wide_tokens.append((left_pos, token_normalized[:len(visible)]))
 
-        chord_aligned = "".join(chord_out).rstrip()
-        lyric_padded = lyric.rstrip()
+        chord_aligned = chord_out.decode('latin-1')
+        if wide_tokens:
+            columns = list(chord_aligned)
+            for left_pos, text in wide_tokens:
+                columns[left_pos:left_pos + len(text)] = text
+            chord_aligned = ''.join(columns)
+        chord_aligned = chord_aligned.rstrip()
+        lyric_padded = lyric_line.rstrip()
         return chord_aligned, lyric_padded
 
     def save_songs_to_database(self, songs: List[Dict]) -> Dict:
@@ -556,13 +895,11 @@ class FileProcessor:
             'errors': []
         }
         
-        for i, song in enumerate(songs):
+        # Preparar todos los datos para la BD antes de enviarlos
+        prepared = []
+        for song in songs:
             try:
-                self._update_progress(f"Guardando canción {i+1}/{len(songs)}", 
-                                    (i / len(songs)) * 100)
-                
-                # Preparar datos para la BD
-                song_data = {
+                prepared.append((song, {
                     'titulo': song['titulo'],
                     'artista': song['artista'],
                     'letra': song['letra'],
@@ -571,25 +908,43 @@ class FileProcessor:
                     'categoria_id': song.get('categoria_id', 1),
                     'estado': 'pendiente',
                     'notas': song.get('notas', 'Importado desde PDF')
-                }
-                
-                # Guardar en BD
-                result = self.db_manager.create_cancion(song_data)
-                if result.get('success'):
-                    results['saved_songs'] += 1
-                else:
-                    results['failed_songs'] += 1
-                    results['errors'].append({
-                        'song': song['titulo'],
-                        'error': result.get('error', 'Error desconocido')
-                    })
-                    
+                }))
             except Exception as e:
                 results['failed_songs'] += 1
                 results['errors'].append({
                     'song': song.get('titulo', 'Desconocido'),
                     'error': str(e)
                 })
+
+        self._update_progress(f"Guardando {len(prepared)} canciones...", 0)
+
+        # Guardar en BD: en lote si el manager lo soporta, si no una por una
+        if hasattr(self.db_manager, 'create_canciones_bulk'):
+            # Los errores llegan por canción en su resultado: una excepción de
+            # una fila no descarta las ya guardadas
+            bulk_results = self.db_manager.create_canciones_bulk(
+                [data for _, data in prepared],
+                progress_callback=lambda done, total: self._update_progress(
+                    f"Guardando canción {done}/{total}", (done / total) * 100))
+        else:
+            bulk_results = []
+            for i, (_, song_data) in enumerate(prepared):
+                self._update_progress(f"Guardando canción {i+1}/{len(prepared)}",
+                                    (i / len(prepared)) * 100)
+                try:
+                    bulk_results.append(self.db_manager.create_cancion(song_data))
+                except Exception as e:
+                    bulk_results.append({'success': False, 'error': str(e)})
+
+        for (song, _), result in zip(prepared, bulk_results):
+            if result.get('success'):
+                results['saved_songs'] += 1
+            else:
+                results['failed_songs'] += 1
+                results['errors'].append({
+                    'song': song['titulo'],
+                    'error': result.get('error', 'Error desconocido')
+                })
                 
         self._update_progress("Guardado completado", 100)
         return results
@@ -603,28 +958,6 @@ class FileProcessor:
     *****************************************************************************************
     """
 
-    def _extract_chords_unstructured(self, text: str) -> List[str]:
-        """Extraer acordes de formato no estructurado (líneas separadas)"""
-        lines = text.split('\n')
-        chords = []
-        
-        for line in lines:
-            line = line.strip()
-            if self._is_chord_line(line):
-                # Extraer tokens que son acordes válidos
-                tokens = line.split()
-                for token in tokens:
-                    if self._is_valid_chord_token(token):
-                        # Normalizar a notación americana
-                        normalized_chord = self._normalize_traditional_to_american(token)
-                        # Asegurar que los acordes menores tengan 'm' minúscula
-                        if normalized_chord.endswith('M') and len(normalized_chord) > 1:
-                            normalized_chord = normalized_chord[:-1] + 'm'
-                        if normalized_chord not in chords:
-                            chords.append(normalized_chord)
-        
-        return chords    
-
     def _convert_single_chord(self, chord: str) -> str:
         """
         Convierte un solo acorde tradicional a americano.
@@ -633,10 +966,10 @@ class FileProcessor:
         chord = chord.strip().upper()
 
         # Patrón: raíz (letras), accidental opcional (#/b), resto (m, 7, sus4...)
-        m = re.match(r'^(DO|RE|MI|FA|SOL|LA|SI)([#B]?)(.*)$', chord, re.IGNORECASE)
+        m = _TRAD_CHORD_SPLIT_RE.match(chord)
         if m:
             root, accidental, rest = m.groups()
-            base = self.TRAD_TO_AMERICAN.get(root.upper(), root)
+            base = TRAD_TO_AMERICAN.get(root.upper(), root)
             return f"{base}{accidental}{rest}"
 
         # Si no es tradicional, devolvemos tal cual (p. ej. C#m)
@@ -653,30 +986,27 @@ class FileProcessor:
         Returns:
             Diccionario con texto y acordes normalizados
         """
-        # Normalizar tabs a espacios
-        chord_line = chord_line.replace("\t", "    ")
-        lyric_line = lyric_line.replace("\t", "    ")
-        
-        # Ajustar longitudes
-        max_len = max(len(chord_line), len(lyric_line))
-        chord_line = chord_line.ljust(max_len)
-        lyric_line = lyric_line.ljust(max_len)
-        
-        # Encontrar tokens de acordes
-        tokens = self._find_chord_tokens_in_line(chord_line)
+        # Expandir tabs respetando las paradas cada 4 columnas (un tab no
+        # siempre equivale a 4 espacios y eso desalinea los acordes)
+        chord_line = chord_line.expandtabs(4)
+        lyric_line = lyric_line.expandtabs(4)
+        
+        # Encontrar tokens de acordes: un solo recorrido con CHORD_TOKEN_RE,
+        # trabajando con las posiciones del match (sin dicts intermedios como
+        # los de _find_chord_tokens_in_line)
         chords = []
-        
-        for token in tokens:
-            token_text = token['text'].strip()
-            
-            if not self._looks_like_chord(token_text):
+        parse_chord = self._parse_chord
+        for match in CHORD_TOKEN_RE.finditer(chord_line):
+            token_text = match.group()
+            # Validar y normalizar con una sola consulta memoizada
+            chord_normalized = parse_chord(token_text)
+            if chord_normalized is None:
                 continue
-                
-            start, end = token['start'], token['end']
-            char_index = self._map_token_to_lyric_index(start, end, lyric_line)
-            
-            # Normalizar acorde
-            chord_normalized = self._normalize_traditional_chord(token_text)
+            start, end = match.span()
+            # Centro del token (como _map_token_to_lyric_index, sin recorte: la
+            # letra se considera extendida con espacios hasta el acorde)
+            span = start + end - 1
+            char_index = (span + ((span >> 1) & 1)) >> 1
             
             chords.append({
                 "chord": chord_normalized,
@@ -698,17 +1028,12 @@ class FileProcessor:
         """
         if not root:
             return root
+        # Caso habitual: la raíz tal cual está en la tabla (sin copia en mayúsculas)
+        american = _ROOT_LOOKUP.get(root)
+        if american is not None:
+            return american
         r = root.strip().upper()
-        # Normalizar SOL -> SOL (en mapping existe)
-        return _TRAD_TO_ANG.get(r, r)  # si no está en el mapping, devuelve la misma (A-G)
-
-    def _pad_to_same_length(self, a: str, b: str):
-        la, lb = len(a), len(b)
-        if la < lb:
-            a = a + " " * (lb - la)
-        elif lb < la:
-            b = b + " " * (la - lb)
-        return a, b
+        return _ROOT_LOOKUP.get(r, r)  # si no está en el mapping, devuelve la misma (A-G)
 
     def _map_token_to_lyric_index(self, start: int, end: int, lyric_line: str) -> int:
         """
@@ -722,14 +1047,12 @@ class FileProcessor:
         Returns:
             Índice en la línea de letra
         """
-        center_col = (start + end - 1) / 2.0
+        # Centro del token redondeado al par (como round()), en enteros
+        span = start + end - 1
+        center = (span + ((span >> 1) & 1)) >> 1
         
-        if center_col < 0:
-            return 0
-        if center_col >= len(lyric_line):
-            return len(lyric_line) - 1 if len(lyric_line) > 0 else 0
-            
-        return int(round(center_col))
+        # Recortar al rango de la letra con min/max, sin ramas
+        return max(0, min(center, len(lyric_line) - 1))
 
     def _extract_chord_lyric_pairs(self, lines: List[str]) -> List[Dict]:
         """
@@ -742,26 +1065,21 @@ class FileProcessor:
         pairs = []
         i = 0
         n = len(lines)
+        # usa tu función _is_chord_line si existe, si no, heurística propia
+        # (se elige una vez, fuera del bucle)
+        is_chord_line = getattr(self, "_is_chord_line", None)
+        if not callable(is_chord_line):
+            is_chord_line = self._is_chord_line_fallback
+        parse_pair = self.parse_aligned_pair
         while i < n:
             line = lines[i].rstrip("\n")
             if not line.strip():
                 i += 1
                 continue
-            # usa tu función _is_chord_line si existe, si no, heurística propia:
-            is_chord = False
-            if hasattr(self, "_is_chord_line") and callable(getattr(self, "_is_chord_line")):
-                is_chord = self._is_chord_line(line)
-            else:
-                # heurística fallback: muchas tokens cortas y mayúsculas o presencia de #/b
-                tokens = [tok for tok in re.split(r'\s+', line) if tok]
-                short_tokens = sum(1 for tok in tokens if len(tok) <= 5)
-                if short_tokens >= max(1, len(tokens)//2) or any(ch in line for ch in ['#', 'b', '♯', '♭', '/']):
-                    is_chord = True
-
-            if is_chord and i + 1 < n:
+            if is_chord_line(line) and i + 1 < n:
                 next_line = lines[i+1]
                 # empareja chord_line (line) con lyric_line (next_line)
-                parsed = self.parse_aligned_pair(self, line, next_line)
+                parsed = parse_pair(line, next_line)
                 parsed['line_index'] = i+1  # índice de la línea de letra en el conjunto original
                 pairs.append(parsed)
                 i += 2
@@ -774,6 +1092,10 @@ class FileProcessor:
         return pairs    
            
     
+    def _is_chord_line_fallback(self, line: str) -> bool:
+        """Heurística de respaldo: muchas tokens cortas o presencia de #/b/♯/♭//"""
+        return _is_chord_line_fallback_impl(line)
+
     def _extract_chords_unstructured(self, text: str) -> List[str]:
         """Extraer acordes de formato no estructurado (líneas separadas)"""
         lines = text.split('\n')
@@ -798,12 +1120,14 @@ class FileProcessor:
     
     def _format_unstructured_lyrics(self, text: str) -> str:
         """Formatear letra en formato no estructurado preservando espaciado"""
-        lines = text.split('\n')
+        # Normalizar cada línea una sola vez (la búsqueda de letra reexaminaba líneas)
+        lines = [l.strip() for l in text.split('\n')]
+        n = len(lines)
         formatted_lines = []
         i = 0
         
-        while i < len(lines):
-            line = lines[i].strip()
+        while i < n:
+            line = lines[i]
             if not line:
                 formatted_lines.append("")
                 i += 1
@@ -816,8 +1140,8 @@ class FileProcessor:
                 
                 # Buscar línea de letra siguiente (no vacía, no acordes, no sección)
                 j = i + 1
-                while j < len(lines) and not lyric_line:
-                    next_line = lines[j].strip()
+                while j < n and not lyric_line:
+                    next_line = lines[j]
                     if (next_line and 
                         not self._is_chord_line(next_line) and 
                         not self._is_section_line(next_line)):
@@ -876,21 +1200,32 @@ class FileProcessor:
         print("Extrayendo texto completo del PDF...")
         
         try:
+            import pdfplumber
             with pdfplumber.open(file_path) as pdf:
                 total_pages = len(pdf.pages)
                 print(f"Extrayendo texto de {total_pages} páginas...")
                 self._update_progress(f"Extrayendo texto de {total_pages} páginas...", 40)
                 
                 # Extraer TODO el texto preservando estructura
-                full_text = ""
-                for page_num, page in enumerate(pdf.pages):
-                    # Usar extracción con layout preservation
-                    text = self._extract_text_preserving_layout(page)
-                    full_text += text + "\n\n"  # Doble salto entre páginas
-                    
-                    progress = 40 + (page_num / total_pages) * 40
-                    self._update_progress(f"Página {page_num + 1}/{total_pages}", progress)
-                    print(f"Página {page_num + 1}/{total_pages}")
+                preserve_layout = options.get('preserve_layout', True)
+                if options.get('parallel', True) and total_pages >= _PARALLEL_PAGES_MIN:
+                    page_texts = self._extract_pages_parallel(file_path, total_pages, preserve_layout)
+                else:
+                    page_texts = []
+                    for page_num, page in enumerate(pdf.pages):
+                        # Usar extracción con layout preservation
+                        page_texts.append(self._extract_text_preserving_layout(page, preserve_layout))
+                        # Soltar los objetos ya analizados de la página (chars,
+                        # layout): si no, el PDF entero queda en memoria
+                        page.flush_cache()
+                        
+                        # Formatear el mensaje solo si el aviso no queda descartado
+                        progress = 40 + (page_num / total_pages) * 40
+                        if self._progress_due(progress):
+                            self._update_progress(f"Página {page_num + 1}/{total_pages}", progress)
+                
+                # Doble salto entre páginas (una sola concatenación al final)
+                full_text = "".join(text + "\n\n" for text in page_texts)
                 
                 # Limpiar y normalizar el texto
                 cleaned_text = self._clean_extracted_text(full_text)
@@ -901,7 +1236,8 @@ class FileProcessor:
                 songs_found = [song] if song else []
                     
         except Exception as e:
-            self.logger.error(f"Error con pdfplumber: {e}")
+            if self.logger:
+                self.logger.error(f"Error con pdfplumber: {e}")
             return {'success': False, 'error': f'Error pdfplumber: {str(e)}'}
             
         return {
@@ -914,160 +1250,263 @@ class FileProcessor:
             'processed_with': 'pdfplumber_improved'
         }
 
-    def _extract_text_preserving_layout(self, page) -> str:
-        """Extraer texto preservando la estructura layout del PDF"""
-        text = ""
+    def _extract_pages_parallel(self, file_path: str, total_pages: int,
+                                preserve_layout: bool = True, worker=None) -> List[str]:
+        """
+        Extraer páginas con pdfplumber en un pool de procesos (pdfminer no es
+        seguro entre hilos). Cada proceso abre el PDF y procesa un bloque
+        contiguo de páginas; el resultado respeta el orden original.
+        worker permite usar otro backend con la misma firma (p. ej. PyPDF2).
+        """
+        worker = worker or _extract_pages_worker
+        max_workers = min(os.cpu_count() or 1, total_pages)
+        chunk = -(-total_pages // max_workers)
+        ranges = [(start, min(start + chunk, total_pages))
+                  for start in range(0, total_pages, chunk)]
+        
+        page_texts = [None] * total_pages
+        done_pages = 0
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = {
+                executor.submit(worker, file_path, start, stop, preserve_layout): start
+                for start, stop in ranges
+            }
+            for future in as_completed(futures):
+                start = futures[future]
+                texts = future.result()
+                page_texts[start:start + len(texts)] = texts
+                
+                done_pages += len(texts)
+                progress = 40 + (done_pages / total_pages) * 40
+                self._update_progress(f"Página {done_pages}/{total_pages}", progress)
+                print(f"Página {done_pages}/{total_pages}")
         
-        # Método 1: Extracción simple (fallback)
-        simple_text = page.extract_text() or ""
+        return page_texts
+
+    def _process_with_pymupdf(self, file_path: str, options: Dict) -> Dict:
+        """Procesar PDF con PyMuPDF: palabras con coordenadas, sin pdfminer"""
+        self._update_progress("Extrayendo texto completo del PDF...", 30)
+        print("Extrayendo texto completo del PDF (PyMuPDF)...")
         
-        # Método 2: Extracción por palabras con coordenadas (más preciso)
         try:
-            words = page.extract_words(
-                keep_blank_chars=False, 
-                use_text_flow=True,
-                extra_attrs=["x0", "top", "x1", "bottom"]  # Agregar atributos necesarios
-            )
-            if words:
-                # Ordenar palabras por posición (top, luego left)
-                words_sorted = sorted(words, key=lambda x: (x.get('top', 0), x.get('x0', 0)))
-                
-                # Reconstruir texto manteniendo estructura
-                lines = {}
-                for word in words_sorted:
-                    line_key = int(word.get('top', 0))  # Agrupar por línea aproximada
-                    if line_key not in lines:
-                        lines[line_key] = []
-                    lines[line_key].append(word.get('text', ''))
-                
-                # Construir texto línea por línea
-                text_lines = []
-                for line_key in sorted(lines.keys()):
-                    line_text = ' '.join(lines[line_key])
-                    text_lines.append(line_text)
+            import fitz  # PyMuPDF
+            doc = fitz.open(file_path)
+            try:
+                total_pages = doc.page_count
+                self._update_progress(f"Extrayendo texto de {total_pages} páginas...", 40)
                 
-                text = '\n'.join(text_lines)
-            else:
-                text = simple_text
+                preserve_layout = options.get('preserve_layout', True)
+                page_texts = []
+                for page_num, page in enumerate(doc):
+                    # get_text("words"): (x0, y0, x1, y1, palabra, bloque, línea, n° palabra)
+                    words = [
+                        {'text': w[4], 'x0': w[0], 'top': w[1], 'x1': w[2], 'bottom': w[3]}
+                        for w in page.get_text("words")
+                    ] if preserve_layout else None
+                    if words:
+                        page_texts.append(self._words_to_layout_text(words))
+                    else:
+                        page_texts.append(page.get_text("text"))
+                    
+                    progress = 40 + (page_num / total_pages) * 40
+                    if self._progress_due(progress):
+                        self._update_progress(f"Página {page_num + 1}/{total_pages}", progress)
+            finally:
+                doc.close()
+            
+            # Doble salto entre páginas, como con pdfplumber
+            full_text = "".join(text + "\n\n" for text in page_texts)
+            cleaned_text = self._clean_extracted_text(full_text)
+            
+            # Crear UNA sola canción con todo el contenido
+            song = self._create_single_song_from_text(cleaned_text, file_path)
+            songs_found = [song] if song else []
+            
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error con PyMuPDF: {e}")
+            return {'success': False, 'error': f'Error PyMuPDF: {str(e)}'}
+            
+        return {
+            'success': True,
+            'file_type': 'pdf',
+            'total_pages': total_pages,
+            'songs_found': songs_found,
+            'extracted_text': full_text,
+            'cleaned_text': cleaned_text,
+            'processed_with': 'pymupdf'
+        }
+
+    def _extract_text_preserving_layout(self, page, preserve_layout: bool = True) -> str:
+        """
+        Extraer texto de una página de pdfplumber. Con preserve_layout se
+        reconstruyen las líneas a partir de las palabras y sus coordenadas;
+        sin él se usa la extracción simple (más rápida)
+        """
+        if not preserve_layout:
+            return page.extract_text() or ""
+        
+        # Extracción por palabras con coordenadas (más preciso). x0/top ya
+        # vienen en cada palabra: extra_attrs partiría las palabras letra a
+        # letra, y use_text_flow no aporta porque luego se ordena por posición
+        try:
+            words = page.extract_words(keep_blank_chars=False)
+            if words:
+                return self._words_to_layout_text(words)
         except Exception as e:
             print(f"⚠️ Error en extracción avanzada, usando método simple: {e}")
-            text = simple_text
         
-        return text
+        # Fallback: extracción simple, solo si hace falta
+        return page.extract_text() or ""
+
+    def _words_to_layout_text(self, words: List[Dict]) -> str:
+        """Reconstruir líneas de texto a partir de palabras con coordenadas (top, x0)"""
+        # Ordenar palabras por posición (top, luego left); las coordenadas se
+        # leen una sola vez por palabra en lugar de en cada comparación
+        rows = sorted(
+            ((word.get('top', 0), word.get('x0', 0), word.get('text', '')) for word in words),
+            key=itemgetter(0, 1)
+        )
+        
+        # Agrupar por línea aproximada (int(top)): tras ordenar, las palabras de
+        # una misma línea son consecutivas, así que basta un recorrido con groupby
+        text_lines = [
+            ' '.join(row[2] for row in line_rows)
+            for _, line_rows in groupby(rows, key=lambda row: int(row[0]))
+        ]
+        
+        return '\n'.join(text_lines)
 
     def _clean_extracted_text(self, text: str) -> str:
         """Limpiar y normalizar texto extraído del PDF"""
         if not text:
             return ""
         
-        # 1. Normalizar saltos de línea
-        lines = text.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # 2. Unir líneas muy cortas (probablemente fragmentadas)
-            if (len(line) < 30 and 
-                cleaned_lines and 
-                len(cleaned_lines[-1]) < 50):
-                cleaned_lines[-1] += " " + line
-            else:
-                cleaned_lines.append(line)
-        
-        # 3. Unir estrofas lógicas (líneas que parecen versos)
+        # 3. Unir estrofas lógicas (líneas que parecen versos), con una línea
+        #    de anticipación sobre el flujo de _iter_merged_lines
         final_lines = []
-        i = 0
-        while i < len(cleaned_lines):
-            current_line = cleaned_lines[i]
+        current_line = None
+        # Solo las líneas cortas pueden unirse. Las líneas de acordes no se
+        # excluyen: _looks_like_chord_line está desactivada a propósito (no se
+        # diferencian acordes en esta etapa), así que se conserva el criterio
+        # de unión que ya daba esa heurística
+        current_joinable = False
+        for next_line in self._iter_merged_lines(text):
+            next_joinable = len(next_line) < 40
+            if current_line is None:
+                current_line, current_joinable = next_line, next_joinable
+                continue
             
             # Si es una línea corta y la siguiente también, unirlas
-            if (i + 1 < len(cleaned_lines) and
-                len(current_line) < 40 and
-                len(cleaned_lines[i + 1]) < 40 and
-                not self._looks_like_chord_line(current_line) and
-                not self._looks_like_chord_line(cleaned_lines[i + 1])):
-                
+            if current_joinable and next_joinable:
                 # Unir líneas consecutivas cortas
-                joined_line = current_line + " " + cleaned_lines[i + 1]
-                final_lines.append(joined_line)
-                i += 2
+                final_lines.append(current_line + " " + next_line)
+                current_line = None
             else:
                 final_lines.append(current_line)
-                i += 1
+                current_line, current_joinable = next_line, next_joinable
+        
+        if current_line is not None:
+            final_lines.append(current_line)
         
         return '\n'.join(final_lines)
 
+    def _iter_merged_lines(self, text: str):
+        """
+        Recorrer el texto línea a línea (sin partirlo en una lista) devolviendo
+        líneas no vacías, con las muy cortas unidas a la anterior
+        """
+        # Fragmentos de la línea en curso y su longitud unida con espacios;
+        # se materializa con join al cerrarla en lugar de concatenar con +=
+        pending = []
+        pending_len = 0
+        
+        # 1. Normalizar saltos de línea
+        for match in _TEXT_LINE_RE.finditer(text):
+            line = match.group().strip()
+            if not line:
+                continue
+                
+            # 2. Unir líneas muy cortas (probablemente fragmentadas)
+            if (len(line) < 30 and 
+                pending and 
+                pending_len < 50):
+                pending.append(line)
+                pending_len += 1 + len(line)
+            else:
+                if pending:
+                    yield " ".join(pending)
+                pending = [line]
+                pending_len = len(line)
+        
+        if pending:
+            yield " ".join(pending)
+
     def _looks_like_chord_line(self, line: str) -> bool:
         """Determinar si una línea parece ser de acordes - SIEMPRE RETORNA FALSE"""
         # Desactivado: no diferenciamos líneas de acordes
         return False
 
     
-    def _detect_tonality_from_text(self, text: str) -> str:
-        """Detección simplificada de tonalidad (opcional)"""
+    def _detect_tonality_from_text(self, text) -> str:
+        """Detección simplificada de tonalidad (opcional). Acepta texto o lista de líneas"""
         # Buscar indicios de tonalidad en el texto
-        lines = text.split('\n')
+        # Con texto plano solo se parten las líneas que se van a mirar
+        lines = text.split('\n', 10) if isinstance(text, str) else text
         
         for line in lines[:10]:  # Buscar en primeras líneas
             line_upper = line.upper()
             
-            # Buscar patrones comunes de tonalidad
-            if ' TONO: ' in line_upper or ' TONALIDAD: ' in line_upper:
-                for key in ['DO', 'RE', 'MI', 'FA', 'SOL', 'LA', 'SI', 'C', 'D', 'E', 'F', 'G', 'A', 'B']:
-                    if key in line_upper:
-                        return key
-            
-            # Buscar acordes comunes al inicio
-            common_keys = {
-                'C': ['DO', 'C'],
-                'G': ['SOL', 'G'], 
-                'D': ['RE', 'D'],
-                'A': ['LA', 'A'],
-                'E': ['MI', 'E'],
-                'F': ['FA', 'F']
-            }
+            # Buscar patrones comunes de tonalidad ("Tono: SOL")
+            for marker in (' TONO: ', ' TONALIDAD: '):
+                pos = line_upper.find(marker)
+                if pos != -1:
+                    match = _KEY_TOKEN_RE.search(line_upper, pos + len(marker))
+                    if match:
+                        return _KEY_ALIAS[match.group(1)]
             
-            for key, indicators in common_keys.items():
-                if any(indicator in line_upper for indicator in indicators):
+            # Buscar acordes comunes al inicio (C, G, D, A, E, F o su nombre tradicional)
+            for match in _KEY_TOKEN_RE.finditer(line_upper):
+                key = _KEY_ALIAS[match.group(1)]
+                if key in _COMMON_KEYS:
                     return key
         
         return 'C'  # Tonalidad por defecto
         
     def _is_section_line(self, line: str) -> bool:
         """Determinar si una línea es una sección (como estrofa, coro)"""
-        line_upper = line.upper()
-        section_indicators = [
-            'VERSO', 'CORO', 'ESTRIBILLO', 'INTRO', 'OUTRO', 'PUENTE',
-            'ESTROFA', 'CODA', 'FINAL'
-        ]
-        
-        return (line_upper in section_indicators or
-                any(indicator in line_upper for indicator in section_indicators))
+        return _is_section_line_impl(line)
 
     def _process_with_pypdf2(self, file_path: str, options: Dict) -> Dict:
         """Procesar PDF usando PyPDF2 (básico)"""
         self._update_progress("Extrayendo texto con PyPDF2...", 30)
         
         songs_found = []
-        extracted_text = ""
+        page_chunks = []  # texto por página, se une al final (evita += cuadrático)
         
         try:
+            import PyPDF2
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
                 total_pages = len(pdf_reader.pages)
                 self._update_progress(f"Analizando {total_pages} páginas...", 40)
                 
-                for page_num in range(total_pages):
-                    page = pdf_reader.pages[page_num]
-                    text = page.extract_text() or ""
-                    extracted_text += f"\n--- Página {page_num + 1} ---\n{text}"
-                    
-                    # Progreso por página
-                    progress = 40 + (page_num / total_pages) * 40
-                    self._update_progress(f"Procesando página {page_num + 1}/{total_pages}", progress)
+                # PyPDF2 es Python puro: con muchas páginas se reparte en procesos
+                if options.get('parallel', True) and total_pages >= _PARALLEL_PAGES_MIN:
+                    page_texts = self._extract_pages_parallel(
+                        file_path, total_pages, worker=_extract_pypdf2_pages_worker)
+                else:
+                    page_texts = []
+                    for page_num in range(total_pages):
+                        page_texts.append(pdf_reader.pages[page_num].extract_text() or "")
+                        
+                        # Progreso por página
+                        progress = 40 + (page_num / total_pages) * 40
+                        if self._progress_due(progress):
+                            self._update_progress(f"Procesando página {page_num + 1}/{total_pages}", progress)
+                
+                for page_num, text in enumerate(page_texts):
+                    page_chunks.append(f"\n--- Página {page_num + 1} ---\n{text}")
                     
                     # Analizar texto en busca de canciones
                     if text.strip():
@@ -1075,7 +1514,8 @@ class FileProcessor:
                         songs_found.extend(page_songs)
                         
         except Exception as e:
-            self.logger.error(f"Error con PyPDF2: {e}")
+            if self.logger:
+                self.logger.error(f"Error con PyPDF2: {e}")
             return {
                 'success': False,
                 'error': f'Error PyPDF2: {str(e)}'
@@ -1086,7 +1526,7 @@ class FileProcessor:
             'file_type': 'pdf',
             'total_pages': total_pages,
             'songs_found': songs_found,
-            'extracted_text': extracted_text,
+            'extracted_text': "".join(page_chunks),
             'processed_with': 'pypdf2'
         }
     
@@ -1100,31 +1540,25 @@ class FileProcessor:
         if len(line) < 3 or len(line) > 100:
             return False
             
-        # Patrones que indican título
-        title_indicators = [
-            line.isupper(),  # Todo en mayúsculas
-            any(keyword in line.lower() for keyword in [
-                'canción', 'cancion', 'himno', 'salmo', 'coro', 'aleluya',
-                'santo', 'gloria', 'padre', 'jesús', 'jesus', 'maría', 'maria'
-            ]),
-            # Línea seguida de espacio en blanco o sección
-            current_index + 1 < len(all_lines) and 
-            (not all_lines[current_index + 1].strip() or 
-             self._is_song_section(all_lines[current_index + 1]))
-        ]
+        # Patrones que indican título (se evalúan en orden y cortan al primero)
+        if line.isupper():  # Todo en mayúsculas
+            return True
         
-        return any(title_indicators)
+        line_lower = line.lower()
+        if any(keyword in line_lower for keyword in _TITLE_KEYWORDS):
+            return True
+        
+        # Línea seguida de espacio en blanco o sección
+        return (current_index + 1 < len(all_lines) and 
+                (not all_lines[current_index + 1].strip() or 
+                 self._is_song_section(all_lines[current_index + 1])))
         
     def _is_song_section(self, line: str) -> bool:
         """Determinar si una línea es una sección musical"""
-        section_indicators = [
-            line.upper() in ['INTRO', 'VERSO', 'CORO', 'ESTRIBILLO', 'PUENTE', 'FINAL', 'CODA'],
-            line.startswith('[') and line.endswith(']'),
-            any(keyword in line.upper() for keyword in [
-                'VERSO', 'CORO', 'ESTROFA', 'PUENTE', 'INTRODUCCIÓN'
-            ])
-        ]
-        return any(section_indicators)
+        line_upper = line.upper()
+        return (line_upper in _SECTION_NAMES or
+                (line.startswith('[') and line.endswith(']')) or
+                any(keyword in line_upper for keyword in _SECTION_KEYWORDS))
             
     def _contains_chords(self, line: str) -> bool:
         """Determinar si una línea contiene acordes - SIEMPRE RETORNA FALSE"""
@@ -1132,59 +1566,54 @@ class FileProcessor:
         return False
         
     def _extract_chords(self, line: str) -> List[str]:
-        """Extraer acordes de una línea"""
-        import re
-        chords = []
+        """Extraer acordes de una línea (sin duplicados, en orden de aparición)"""
+        # Sin corchetes no hay acordes entre corchetes: evitar esa búsqueda
+        if '[' not in line:
+            return list(dict.fromkeys(_LOOSE_CHORD_RE.findall(line)))
+        
         # Buscar acordes entre corchetes
-        bracket_chords = re.findall(r'\[([A-G][#b]?[0-9]*(?:m|maj|min|dim|aug)?[0-9]*)\]', line, re.IGNORECASE)
-        chords.extend(bracket_chords)
+        chords = _BRACKET_CHORD_RE.findall(line)
         
-        # Buscar acordes sueltos
-        loose_chords = re.findall(r'\b([A-G][#b]?(?:m|maj|min|dim|aug)?[0-9]*)\b', line, re.IGNORECASE)
-        chords.extend(loose_chords)
+        # Buscar acordes sueltos fuera de los corchetes ya reconocidos
+        # (antes la segunda búsqueda volvía a recorrer su contenido)
+        stripped = _BRACKET_CHORD_RE.sub(' ', line) if chords else line
+        chords.extend(_LOOSE_CHORD_RE.findall(stripped))
         
-        return list(set(chords))  # Remover duplicados
+        return list(dict.fromkeys(chords))  # Remover duplicados preservando el orden
                 
     def _detect_probable_key(self, chords: List[str]) -> str:
         """Detectar tonalidad probable basada en acordes - Versión mejorada"""
         if not chords:
             return 'C'
         
-        # Conteo de acordes por nota base
-        chord_count = {}
-        for chord in chords:
-            # Extraer la nota base (primera letra)
-            if chord and chord[0].upper() in 'CDEFGAB':
-                base_note = chord[0].upper()
-                chord_count[base_note] = chord_count.get(base_note, 0) + 1
+        # Conteo de acordes por nota base (primera letra)
+        chord_count = Counter(
+            chord[0].upper() for chord in chords
+            if chord and chord[0].upper() in 'CDEFGAB'
+        )
         
         # Si no hay acordes válidos, fallback a C
         if not chord_count:
             return 'C'
         
-        # Tonalidades más comunes en música cristiana (orden de probabilidad)
-        # C es la más común, luego G, luego D, etc.
-        common_keys = ['C', 'G', 'D', 'A', 'F', 'E', 'Bb', 'Eb', 'Am', 'Dm', 'Em']
-        
-        # Buscar la tonalidad más probable basada en frecuencia y orden común
-        most_common_note = max(chord_count.items(), key=lambda x: x[1])[0]
-        
-        # Priorizar C sobre G si están cerca en frecuencia
-        c_count = chord_count.get('C', 0)
-        g_count = chord_count.get('G', 0)
+        # C es la tonalidad más común en música cristiana, luego G:
+        # priorizar C si tiene al menos tantos acordes como G
+        c_count = chord_count['C']
+        g_count = chord_count['G']
         
-        # Si C y G tienen conteos similares, priorizar C
-        if c_count > 0 and (c_count >= g_count or (c_count == g_count and most_common_note == 'C')):
+        if c_count > 0 and c_count >= g_count:
             return 'C'
         elif g_count > 0:
             return 'G'
         
         # Si no hay C o G claros, usar el más común
-        return most_common_note
+        return chord_count.most_common(1)[0][0]
         
     def process_files_batch(self, file_paths: List[str], options: Dict = None) -> Dict:
         """
-        Procesar múltiples archivos (versión simplificada sin threads)
+        Procesar múltiples archivos.
+        Cada archivo es independiente: con más de uno se reparten entre procesos
+        (options['parallel'] = False fuerza el modo secuencial).
         """
         options = options or {}
         results = {
@@ -1196,12 +1625,18 @@ class FileProcessor:
             'file_results': []
         }
         
-        for i, file_path in enumerate(file_paths):
-            self._update_progress(f"Procesando archivo {i+1}/{len(file_paths)}", 
-                                (i / len(file_paths)) * 100)
-            
-            # Procesar según tipo de archivo (pdf, docx, txt...)
-            file_result = self._process_single_file(file_path, options)
+        if len(file_paths) > 1 and options.get('parallel', True):
+            file_results = self._process_files_parallel(file_paths, options)
+        else:
+            file_results = []
+            for i, file_path in enumerate(file_paths):
+                self._update_progress(f"Procesando archivo {i+1}/{len(file_paths)}", 
+                                    (i / len(file_paths)) * 100)
+                
+                # Procesar según tipo de archivo (pdf, docx, txt...)
+                file_results.append(self._process_single_file(file_path, options))
+        
+        for file_result in file_results:
             results['file_results'].append(file_result)
             results['processed_files'] += 1
             
@@ -1214,6 +1649,43 @@ class FileProcessor:
         self._update_progress("Procesamiento completado", 100)
         return results    
     
+    def _process_files_parallel(self, file_paths: List[str], options: Dict) -> List[Dict]:
+        """Procesar archivos en un pool de procesos, devolviendo resultados en el orden de entrada"""
+        total = len(file_paths)
+        file_results = [None] * total
+        max_workers = min(os.cpu_count() or 1, total)
+        
+        # Los archivos sin cambios se resuelven desde la caché, sin enviarlos al pool
+        pending = {}
+        for i, file_path in enumerate(file_paths):
+            cache_key = self._file_cache_key(file_path, options)
+            cached = self._cached_file_result(cache_key)
+            if cached is not None:
+                file_results[i] = cached
+            else:
+                pending[i] = cache_key
+        
+        if not pending:
+            return file_results
+        
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+            futures = {
+                executor.submit(_process_single_file_worker, file_paths[i], options): i
+                for i in pending
+            }
+            # El progreso se reporta desde este hilo a medida que terminan los archivos
+            for done, future in enumerate(as_completed(futures), total - len(pending) + 1):
+                i = futures[future]
+                try:
+                    file_results[i] = future.result()
+                except Exception as e:
+                    file_results[i] = {'success': False, 'error': str(e)}
+                self._remember_file_result(pending[i], file_results[i])
+                self._update_progress(f"Procesando archivo {done}/{total}",
+                                    (done / total) * 100)
+        
+        return file_results
+    
     
 
     def _extract_title_from_text(self, lines: List[str], default_title: str) -> str:
@@ -1226,8 +1698,9 @@ class FileProcessor:
                 continue
                 
             # Saltarse líneas muy cortas o de un solo carácter que suelen ser acordes
-            # o referencias de página no detectadas.
-            if len(line) < 3:
+            # o referencias de página no detectadas. Solo líneas entre 3 y 50
+            # caracteres son candidatas a título: se filtran antes de los predicados.
+            if len(line) < 3 or len(line) > 50:
                 continue
                 
             # Saltar líneas que son acordes (usando el método existente)
@@ -1239,34 +1712,17 @@ class FileProcessor:
             if self._is_section_line(line):
                 continue
                 
-            # Líneas entre 3 y 50 caracteres son candidatas a título
-            if 3 <= len(line) <= 50:
-                
-                # 2. **PRIORIDAD MÁXIMA:** Si está entre comillas (formato explícito)
-                if (line.startswith('"') and line.endswith('"')) or \
-                (line.startswith('«') and line.endswith('»')) or \
-                (line.startswith("'") and line.endswith("'")):
-                    # Devuelve el título sin las comillas
-                    return line[1:-1].strip()
-                
-                # 3. **ALTA PRIORIDAD:** Títulos en MAYÚSCULAS o con el formato de título habitual
-                # - Si no contiene acordes
-                # - Y tiene más de una palabra (para evitar acordes largos como "M17" o "MI7")
-                # - O está completamente en MAYÚSCULAS (como "CARNAVALITO DEL MISIONERO")
-                
-                # El cambio clave es: ¡Permitir títulos en MAYÚSCULAS!
-                
-                # **Aseguramos que no sean acordes:**
-                if not self._contains_chords(line):
-                    
-                    # **Si es un título completamente en MAYÚSCULAS y pasa el filtro de acordes, lo retornamos.**
-                    if line.isupper():
-                        return line
-                    
-                    # **Si es un título en formato normal (no todo mayúsculas), también lo retornamos.**
-                    # Esta es tu condición original, pero ahora permite las mayúsculas antes.
-                    if not line.isupper():
-                        return line
+            # 2. **PRIORIDAD MÁXIMA:** Si está entre comillas (formato explícito)
+            if (line.startswith('"') and line.endswith('"')) or \
+            (line.startswith('«') and line.endswith('»')) or \
+            (line.startswith("'") and line.endswith("'")):
+                # Devuelve el título sin las comillas
+                return line[1:-1].strip()
+            
+            # 3. **ALTA PRIORIDAD:** Títulos en MAYÚSCULAS (como "CARNAVALITO DEL MISIONERO")
+            # o en formato normal. _contains_chords está desactivado (siempre False),
+            # así que no se invoca: cualquier candidata que llegue aquí es el título.
+            return line
                 
         # 4. Si no se encuentra un título, retorna el valor por defecto
         print ("Titulo retornado: ", default_title)
@@ -1283,16 +1739,39 @@ class FileProcessor:
         Returns:
             Lista de dicts con 'text', 'start', 'end' para cada token
         """
-        tokens = []
-        
-        for match in CHORD_TOKEN_RE.finditer(chord_line):
-            token_text = match.group(0).strip()
-            
-            if token_text and self._is_valid_chord_token(token_text):
-                tokens.append({
-                    'text': token_text,
-                    'start': match.start(),
-                    'end': match.end()
-                })
-        
-        return tokens
\ No newline at end of file
+        # CHORD_TOKEN_RE nunca captura espacios ni coincidencias vacías
+        is_valid = self._is_valid_chord_token
+        return [
+            {'text': match.group(), 'start': match.start(), 'end': match.end()}
+            for match in CHORD_TOKEN_RE.finditer(chord_line)
+            if is_valid(match.group())
+        ]
+
+
+def _process_single_file_worker(file_path: str, options: Dict) -> Dict:
+    """Punto de entrada de los procesos del pool (función de módulo para poder serializarla)"""
+    # Los archivos ya se reparten entre procesos: sin pools anidados por página
+    return FileProcessor()._process_file_by_type(file_path, dict(options, parallel=False))
+
+
+def _extract_pages_worker(file_path: str, start: int, stop: int,
+                          preserve_layout: bool = True) -> List[str]:
+    """Extraer el texto de las páginas [start, stop) de un PDF en un proceso del pool"""
+    import pdfplumber
+    processor = FileProcessor()
+    page_texts = []
+    with pdfplumber.open(file_path) as pdf:
+        for i in range(start, stop):
+            page = pdf.pages[i]
+            page_texts.append(processor._extract_text_preserving_layout(page, preserve_layout))
+            page.flush_cache()
+    return page_texts
+
+
+def _extract_pypdf2_pages_worker(file_path: str, start: int, stop: int,
+                                 preserve_layout: bool = True) -> List[str]:
+    """Igual que _extract_pages_worker pero con PyPDF2 (preserve_layout no aplica)"""
+    import PyPDF2
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[i].extract_text() or "" for i in range(start, stop)]
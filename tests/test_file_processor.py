@@ -2,6 +2,7 @@
 import pytest
 import sys
 import os
+import time
 
 # Agregar el directorio core al path para importar FileProcessor
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -22,13 +23,24 @@ class TestFileProcessor:
             ("LAm", "Am"),
             ("SI", "B"),            
             ("MIm", "Em"),
-            ("FAm", "Fm")
+            ("FAm", "Fm"),
+            ("DO/SOL", "C/G"),
+            ("LAm/do", "Am/C"),
+            ("Bb/F", "Bb/F"),
+            ("FA♯m", "F#m")
         ]
         
         for input_chord, expected in test_cases:
             result = processor._normalize_traditional_to_american(input_chord)
             assert result == expected, f"'{input_chord}' -> '{result}', esperaba '{expected}'"
 
+    def test_map_traditional_root(self):
+        """Raíces tradicionales a americanas; las americanas quedan en mayúscula"""
+        processor = FileProcessor(None)
+        
+        for root, expected in [("DO", "C"), ("sol", "G"), ("La", "A"), (" si ", "B"), ("e", "E"), ("", "")]:
+            assert processor._map_traditional_root(root) == expected
+
     def test_looks_like_chord(self):
         """Test de detección de acordes válidos/inválidos"""
         processor = FileProcessor(None)
@@ -134,6 +146,37 @@ Alaba al Señor"""
         assert "Am" in result, "LAm no se normalizó a Am"
         assert "Esta es una prueba" in result, "Letra no se incluyó correctamente"
 
+    def test_parse_aligned_pair_tabs(self):
+        """Los tabs se expanden hasta la siguiente parada de 4 columnas"""
+        processor = FileProcessor(None)
+        
+        result = processor.parse_aligned_pair("DO\tSOL", "Ala\tba")
+        
+        assert result['text'] == "Ala ba"
+        assert [c['col_start'] for c in result['chords']] == [0, 4]
+
+    def test_align_chord_over_lyric_non_latin1_token(self):
+        """Acordes con caracteres fuera de latin-1 ('７' de ancho completo) se alinean sin error"""
+        processor = FileProcessor(None)
+        
+        chords, lyric = processor.align_chord_over_lyric('C７      G', 'hola mundo cruel')
+        
+        assert chords == 'C７      G'
+        assert lyric == 'hola mundo cruel'
+
+    def test_extract_chord_lyric_pairs(self):
+        """Test de emparejado línea de acordes + línea de letra"""
+        processor = FileProcessor(None)
+        
+        lines = ["DO SOL", "Alaba al Señor", "", "Solo letra aquí"]
+        pairs = processor._extract_chord_lyric_pairs(lines)
+        
+        assert len(pairs) == 2
+        assert pairs[0]['text'] == "Alaba al Señor"
+        assert pairs[0]['line_index'] == 1
+        assert [c['chord'] for c in pairs[0]['chords']] == ["C", "G"]
+        assert pairs[1] == {"text": "Solo letra aquí", "chords": [], "line_index": 3}
+
     def test_process_pdf_single_song(self):
         """Test de procesamiento de PDF como canción única"""
         processor = FileProcessor(None)
@@ -155,6 +198,92 @@ Alaba al Señor"""
         assert "letra" in song, "La canción no tiene letra"
         assert "CARNAVALITO" in song["titulo"] or "test" in song["titulo"], "Título incorrecto"
 
+    def test_pdf_disk_cache(self, tmp_path, monkeypatch):
+        """La caché en disco se invalida al cambiar el archivo o las opciones"""
+        import core.file_processor as fp_module
+        monkeypatch.setattr(fp_module, '_DISK_CACHE_DIR', str(tmp_path / 'cache'))
+        processor = FileProcessor(None)
+        
+        pdf_path = tmp_path / 'cancion.pdf'
+        pdf_path.write_bytes(b'%PDF-1.4 uno')
+        cache_path = processor._disk_cache_path(str(pdf_path), {})
+        assert processor._load_disk_cache(cache_path) is None
+        
+        result = {'success': True, 'songs_found': [{'titulo': 'Aleluya'}]}
+        processor._store_disk_cache(cache_path, result)
+        assert processor._load_disk_cache(cache_path) == result
+        
+        assert processor._disk_cache_path(str(pdf_path), {'use_pymupdf': False}) != cache_path
+        pdf_path.write_bytes(b'%PDF-1.4 dos, otro contenido')
+        assert processor._disk_cache_path(str(pdf_path), {}) != cache_path
+        
+        # Una nueva versión de la extracción invalida los resultados guardados
+        cache_path = processor._disk_cache_path(str(pdf_path), {})
+        monkeypatch.setattr(fp_module, '_CACHE_VERSION', fp_module._CACHE_VERSION + 1)
+        assert processor._disk_cache_path(str(pdf_path), {}) != cache_path
+
+    def test_pdf_disk_cache_pruning(self, tmp_path, monkeypatch):
+        """La caché en disco no crece más allá del máximo de entradas"""
+        import core.file_processor as fp_module
+        cache_dir = tmp_path / 'cache'
+        monkeypatch.setattr(fp_module, '_DISK_CACHE_MAX_ENTRIES', 2)
+        processor = FileProcessor(None)
+        
+        for i in range(4):
+            path = cache_dir / f'{i}.json'
+            processor._store_disk_cache(str(path), {'success': True})
+            os.utime(path, (1000 + i, time.time() - 10 + i))
+        processor._prune_disk_cache(str(cache_dir))
+        
+        assert sorted(p.name for p in cache_dir.iterdir()) == ['2.json', '3.json']
+
+    def test_pdf_backend_fallback(self, tmp_path, monkeypatch):
+        """Si PyMuPDF falla se prueba con el siguiente método disponible"""
+        import core.file_processor as fp_module
+        for flag in ('PYMUPDF_SUPPORT', 'PDFPLUMBER_SUPPORT', 'PDF_SUPPORT'):
+            monkeypatch.setattr(fp_module, flag, True)
+        processor = FileProcessor(None)
+        monkeypatch.setattr(processor, '_process_with_pymupdf',
+                            lambda path, options: {'success': False, 'error': 'fitz'})
+        monkeypatch.setattr(processor, '_process_with_pdfplumber',
+                            lambda path, options: {'success': True, 'processed_with': 'pdfplumber'})
+        
+        pdf_path = tmp_path / 'cancion.pdf'
+        pdf_path.write_bytes(b'%PDF-1.4')
+        result = processor.process_pdf_file(str(pdf_path), {'no_cache': True})
+        
+        assert result == {'success': True, 'processed_with': 'pdfplumber'}
+
+    def test_file_cache_is_bounded(self, tmp_path, monkeypatch):
+        """La caché en memoria guarda solo los últimos archivos y omite los PDF"""
+        import core.file_processor as fp_module
+        monkeypatch.setattr(fp_module, '_FILE_CACHE_MAX_ENTRIES', 2)
+        processor = FileProcessor(None)
+        calls = []
+        monkeypatch.setattr(processor, '_process_file_by_type',
+                            lambda path, options: calls.append(path) or {'success': True})
+        
+        paths = []
+        for name in ('a.txt', 'b.txt', 'c.txt'):
+            path = tmp_path / name
+            path.write_text(name, encoding='utf-8')
+            paths.append(str(path))
+            processor._process_single_file(str(path), {})
+        
+        assert len(processor._file_cache) == 2
+        processor._process_single_file(paths[2], {})  # en caché
+        processor._process_single_file(paths[0], {})  # descartado
+        assert calls == paths + [paths[0]]
+        assert processor._file_cache_key(str(tmp_path / 'x.pdf'), {}) is None
+
+    def test_extract_chords(self):
+        """Test de extracción de acordes: sin duplicados y en orden de aparición"""
+        processor = FileProcessor(None)
+        
+        assert processor._extract_chords("[C] Alaba [Am7] al Señor G C") == ["C", "Am7", "G"]
+        assert processor._extract_chords("[G/B] Canta") == ["G", "B"]
+        assert processor._extract_chords("") == []
+
     def test_detect_probable_key(self):
         """Test de detección de tonalidad probable"""
         processor = FileProcessor(None)
@@ -218,4 +347,38 @@ def test_traditional_note_recognition():
     
     for note, expected in traditional_notes:
         result = processor._is_valid_chord_token(note)
-        assert result == expected, f"Nota tradicional '{note}' -> {result}, esperaba {expected}"
\ No newline at end of file
+        assert result == expected, f"Nota tradicional '{note}' -> {result}, esperaba {expected}"
+
+def test_chord_caches_do_not_retain_processor():
+    """Las cachés de acordes son de módulo: no retienen la instancia"""
+    import gc
+    import weakref
+    processor = FileProcessor(None)
+    processor._is_chord_line("DO SOL")
+    processor._parse_chord("LAm")
+    ref = weakref.ref(processor)
+    del processor
+    gc.collect()
+    assert ref() is None
+
+def test_save_songs_bulk_reports_per_song():
+    """El guardado en lote cuenta fallos por canción e informa el progreso"""
+    class FakeDB:
+        def create_canciones_bulk(self, canciones, progress_callback=None):
+            results = []
+            for i, data in enumerate(canciones, 1):
+                ok = data['titulo'] != 'B'
+                results.append({'success': ok} if ok else {'success': False, 'error': 'x'})
+                progress_callback(i, len(canciones))
+            return results
+
+    processor = FileProcessor(FakeDB())
+    progress = []
+    processor.set_progress_callback(lambda msg, pct: progress.append(pct))
+    songs = [{'titulo': t, 'artista': '', 'letra': ''} for t in ('A', 'B', 'C')]
+    
+    result = processor.save_songs_to_database(songs)
+    
+    assert result['saved_songs'] == 2
+    assert result['errors'] == [{'song': 'B', 'error': 'x'}]
+    assert len([p for p in progress if 0 < p < 100]) == 2
@@ -11,6 +11,7 @@ class Editor:
         self.songs_pending_review = []
         self.current_song_index = -1
         self.chord_pattern = re.compile(r'\[([A-G][#b]?[0-9]*(?:m|maj|min|dim|aug)?[0-9]*(?:\/[A-G][#b]?)?)\]')
+        self.section_pattern = re.compile(r'\[(VERSO|CORO|PUENTE|INTRO|OUTRO)(?:\s+\d+)?\]', re.IGNORECASE)
         self.loading_song = False
         self.categories = []
         self.selected_categories = []
@@ -817,8 +818,7 @@ class Editor:
             self.text_editor.tag_add("chord", start, end)
             
         # Resaltar secciones
-        section_pattern = re.compile(r'\[(VERSO|CORO|PUENTE|INTRO|OUTRO)(?:\s+\d+)?\]', re.IGNORECASE)
-        for match in section_pattern.finditer(text):
+        for match in self.section_pattern.finditer(text):
             start = f"1.0+{match.start()}c"
             end = f"1.0+{match.end()}c"
             self.text_editor.tag_add("section", start, end)